@@ -7,12 +7,20 @@ def run_scripts():
     print(f"[{datetime.now()}] Запуск скриптов...")
     try:
         subprocess.run(["python", "parsers/parser_kancleroptshilovo.py"], check=True)
-        subprocess.run(["python", "parsers/parser_officemag.p"], check=True)
+        subprocess.run(["python", "parsers/parser_officemag.py"], check=True)
         print("Скрипты выполнены.")
     except subprocess.CalledProcessError as e:
         print(f"Ошибка при выполнении скрипта: {e}")
 
+def downsample_history():
+    print(f"[{datetime.now()}] Прореживание истории цен...")
+    try:
+        subprocess.run(["python", "parsers/price_history.py"], check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"Ошибка при прореживании истории цен: {e}")
+
 schedule.every().day.at("00:00").do(run_scripts)
+schedule.every().sunday.at("06:00").do(downsample_history)
 
 print("Планировщик запущен. Ожидаем запуск в 00:00...")
 while True:
@@ -7,6 +7,7 @@ from selenium import webdriver
 from selenium_stealth import stealth
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
+from price_history import record_history
 
 DB_FILE = "data.db"
 MAX_THREADS = 4
@@ -281,15 +282,14 @@ def _is_out_of_stock(amount: str) -> bool:
     return "нет в наличии" in a
 
 
-def save_products_batch(section_name: str, products: Dict[str, Dict], table_name: str = "kancleroptshilovo_products") -> int:
+def save_products_batch(section_name: str, products: Dict[str, Dict], table_name: str = "kancleroptshilovo_products",
+                        page_url: str = "") -> int:
     if not products:
         return 0
     filtered = [
         p for p in products.values()
         if not _is_out_of_stock(p.get("amount", ""))
     ]
-    if not filtered:
-        return 0
     rows = [
         (section_name, p["name"], p["description"], p["price"], p["amount"], p["image_url"], p["product_url"])
         for p in filtered
@@ -314,6 +314,9 @@ def save_products_batch(section_name: str, products: Dict[str, Dict], table_name
             (category, name, description, price, amount, image_url, product_url)
             VALUES (?, ?, ?, ?, ?, ?, ?)
         """, rows)
+        # Products without their own link fall back to page_url and cannot be told apart.
+        linked = [p for p in products.values() if p.get("product_url") != page_url]
+        record_history(conn, table_name, linked)
         conn.commit()
         conn.close()
     return len(rows)
@@ -329,7 +332,7 @@ def parse_section(section_name: str, section_url: str) -> int:
             products = parse_products_page(driver, section_name, page_url)
             if not products:
                 break
-            added = save_products_batch(section_name, products)
+            added = save_products_batch(section_name, products, page_url=page_url)
             total_added += added
             page += 1
     finally:
@@ -3,6 +3,7 @@ import sqlite3
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium_stealth import stealth
+from price_history import record_history
 
 DB_FILE = "data.db"
 
@@ -125,6 +126,9 @@ def build_catalog_with_products(driver, base_url, max_products=None):
     return all_data
 
 def save_to_sqlite(data, table_name="officemag_products"):
+    if not any(data.values()):
+        print(f"Нет спаршенных товаров, таблица '{table_name}' оставлена без изменений")
+        return
     conn = sqlite3.connect(DB_FILE)
     cur = conn.cursor()
     cur.execute(f"""
@@ -139,6 +143,7 @@ def save_to_sqlite(data, table_name="officemag_products"):
             product_url TEXT
         )
     """)
+    cur.execute(f"DELETE FROM {table_name}")
     for section, products in data.items():
         for _, product in products.items():
             cur.execute(f"""
@@ -153,9 +158,13 @@ def save_to_sqlite(data, table_name="officemag_products"):
                 product["image_url"],
                 product["product_url"]
             ))
+    changed = record_history(
+        conn, table_name,
+        (product for products in data.values() for product in products.values())
+    )
     conn.commit()
     conn.close()
-    print(f"Данные сохранены в SQLite таблицу '{table_name}' ({DB_FILE})")
+    print(f"Данные сохранены в SQLite таблицу '{table_name}' ({DB_FILE}), изменений цен и остатков: {changed}")
 
 if __name__ == "__main__":
     driver = init_webdriver()
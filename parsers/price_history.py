@@ -0,0 +1,142 @@
+import re
+import sys
+import time
+import sqlite3
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DB_FILE = "data.db"
+HISTORY_TABLE = "price_history"
+DOWNSAMPLE_AFTER_DAYS = 90
+DOWNSAMPLE_BUCKET_DAYS = 7
+DAY_SECONDS = 24 * 60 * 60
+
+
+def init_history_table(conn: sqlite3.Connection) -> None:
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {HISTORY_TABLE} (
+            source TEXT NOT NULL,
+            product_url TEXT NOT NULL,
+            ts INTEGER NOT NULL,
+            price_kopecks INTEGER NOT NULL,
+            amount INTEGER NOT NULL,
+            PRIMARY KEY (product_url, ts, source)
+        ) WITHOUT ROWID
+    """)
+
+
+def price_to_kopecks(price: str) -> Optional[int]:
+    match = re.search(r"(?<![\d.,])\d[\d\s]*(?:[.,]\d+)?", str(price))
+    if not match:
+        return None
+    cleaned = re.sub(r"\s", "", match.group()).replace(",", ".")
+    try:
+        value = Decimal(cleaned)
+    except InvalidOperation:
+        return None
+    return int((value * 100).to_integral_value())
+
+
+def amount_to_int(amount: str) -> int:
+    digits = "".join(filter(str.isdigit, str(amount)))
+    return int(digits) if digits else 0
+
+
+def record_history(conn: sqlite3.Connection, source: str, products: Iterable[Dict], ts: Optional[int] = None) -> int:
+    if ts is None:
+        ts = int(time.time())
+    points: Dict[str, Tuple[int, int]] = {}
+    for p in products:
+        product_url = p.get("product_url")
+        price_kopecks = price_to_kopecks(p.get("price", ""))
+        # Parsers fall back to a bare "...#" link when a product has none.
+        if not product_url or product_url.endswith("#") or price_kopecks is None:
+            continue
+        points[product_url] = (price_kopecks, amount_to_int(p.get("amount", "")))
+    init_history_table(conn)
+    rows = []
+    for product_url, point in points.items():
+        last = conn.execute(f"""
+            SELECT price_kopecks, amount
+            FROM {HISTORY_TABLE}
+            WHERE product_url = ? AND source = ? AND ts <= ?
+            ORDER BY ts DESC
+            LIMIT 1
+        """, (product_url, source, ts)).fetchone()
+        if last is not None and tuple(last) == point:
+            continue
+        rows.append((source, product_url, ts, point[0], point[1]))
+    conn.executemany(f"""
+        INSERT OR REPLACE INTO {HISTORY_TABLE}
+        (source, product_url, ts, price_kopecks, amount)
+        VALUES (?, ?, ?, ?, ?)
+    """, rows)
+    return len(rows)
+
+
+def get_history(conn: sqlite3.Connection, product_url: str, since: int, until: int,
+                source: Optional[str] = None) -> List[Tuple[str, int, int, int]]:
+    init_history_table(conn)
+    source_clause = "AND source = :source" if source else ""
+    # The point just before the range carries the price in effect at its start.
+    return conn.execute(f"""
+        SELECT source, ts, price_kopecks, amount
+        FROM {HISTORY_TABLE}
+        WHERE product_url = :product_url AND ts BETWEEN :since AND :until {source_clause}
+        UNION
+        SELECT source, MAX(ts), price_kopecks, amount
+        FROM {HISTORY_TABLE}
+        WHERE product_url = :product_url AND ts < :since {source_clause}
+        GROUP BY source
+        ORDER BY source, ts
+    """, {"product_url": product_url, "since": since, "until": until, "source": source}).fetchall()
+
+
+def downsample_history(conn: sqlite3.Connection, older_than_days: int = DOWNSAMPLE_AFTER_DAYS,
+                       bucket_days: int = DOWNSAMPLE_BUCKET_DAYS, now: Optional[int] = None) -> int:
+    if now is None:
+        now = int(time.time())
+    cutoff = now - older_than_days * DAY_SECONDS
+    bucket = bucket_days * DAY_SECONDS
+    init_history_table(conn)
+    # Keep only the last point of every (product, bucket) before the cutoff.
+    cur = conn.execute(f"""
+        DELETE FROM {HISTORY_TABLE}
+        WHERE ts < :cutoff AND EXISTS (
+            SELECT 1 FROM {HISTORY_TABLE} later
+            WHERE later.source = {HISTORY_TABLE}.source
+              AND later.product_url = {HISTORY_TABLE}.product_url
+              AND later.ts > {HISTORY_TABLE}.ts
+              AND later.ts < :cutoff
+              AND later.ts / :bucket = {HISTORY_TABLE}.ts / :bucket
+        )
+    """, {"cutoff": cutoff, "bucket": bucket})
+    removed = cur.rowcount
+    # Collapsing buckets can leave neighbouring points with equal values.
+    cur = conn.execute(f"""
+        DELETE FROM {HISTORY_TABLE}
+        WHERE (source, product_url, ts) IN (
+            SELECT source, product_url, ts FROM (
+                SELECT source, product_url, ts, price_kopecks, amount,
+                       LAG(price_kopecks) OVER w AS prev_price,
+                       LAG(amount) OVER w AS prev_amount
+                FROM {HISTORY_TABLE}
+                WINDOW w AS (PARTITION BY source, product_url ORDER BY ts)
+            )
+            WHERE prev_price = price_kopecks AND prev_amount = amount
+        )
+    """)
+    removed += cur.rowcount
+    return removed
+
+
+if __name__ == "__main__":
+    db_file = sys.argv[1] if len(sys.argv) > 1 else DB_FILE
+    conn = sqlite3.connect(db_file)
+    try:
+        removed = downsample_history(conn)
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    print(f"Прорежено точек истории цен: {removed} ({db_file})")
@@ -1,11 +1,14 @@
 import os
+import time
 from flask import Flask, render_template, request, jsonify
 import sqlite3
 from user_agents import parse
+from parsers.price_history import get_history, DAY_SECONDS
 
 app = Flask(__name__)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_FILE = os.path.join(BASE_DIR, "parsers", "data.db")
+MAX_HISTORY_DAYS = 3 * 365
 
 
 def get_all_products():
@@ -107,5 +110,41 @@ def get_products():
     })
 
 
+@app.route("/price_history")
+def price_history():
+    product_url = request.args.get("product_url", "")
+    if not product_url:
+        return jsonify({"error": "product_url обязателен"}), 400
+    source = request.args.get("source") or None
+    try:
+        days = int(request.args.get("days") or 90)
+    except ValueError:
+        days = 90
+    days = min(max(days, 1), MAX_HISTORY_DAYS)
+    if not os.path.exists(DB_FILE):
+        raise FileNotFoundError(f"SQLite база не найдена: {DB_FILE}")
+    until = int(time.time())
+    since = until - days * DAY_SECONDS
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        rows = get_history(conn, product_url, since, until, source)
+    finally:
+        conn.close()
+    history = [
+        {
+            "source": row_source,
+            "ts": ts,
+            "price": price_kopecks / 100,
+            "price_kopecks": price_kopecks,
+            "amount": amount
+        }
+        for row_source, ts, price_kopecks, amount in rows
+    ]
+    return jsonify({
+        "product_url": product_url,
+        "history": history
+    })
+
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file